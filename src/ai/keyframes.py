@@ -0,0 +1,215 @@
+import logging
+import asyncio
+import heapq
+import multiprocessing
+from collections import OrderedDict
+from typing import List, Optional
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from src.config import (
+    VIDEO_KEYFRAME_MODE, VIDEO_KEYFRAME_METHOD, VIDEO_KEYFRAME_COUNT,
+    VIDEO_KEYFRAME_MIN_SIZE_MB, VIDEO_KEYFRAME_MIN_DURATION_S,
+    VIDEO_KEYFRAME_CACHE_SIZE, VIDEO_KEYFRAME_WORKERS, VIDEO_KEYFRAME_TIMEOUT_S,
+)
+
+logger = logging.getLogger(__name__)
+
+if VIDEO_KEYFRAME_MODE != "off" and cv2 is None:
+    logger.warning("VIDEO_KEYFRAME_MODE включен, но OpenCV (cv2) не установлен. Видео будут загружаться через File API.")
+
+KEYFRAME_MAX_SIDE = 768
+KEYFRAME_JPEG_QUALITY = 85
+SCENE_CANDIDATES_PER_FRAME = 6
+# forkserver порождает процессы от чистого однопоточного сервера, без повторного импорта бота на каждое видео
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_extraction_slots = asyncio.Semaphore(VIDEO_KEYFRAME_WORKERS)
+_frames_cache: "OrderedDict[str, List[bytes]]" = OrderedDict()
+
+
+def keyframes_available() -> bool:
+    return VIDEO_KEYFRAME_MODE != "off" and cv2 is not None
+
+
+def should_use_keyframes(file_size: Optional[int], duration: Optional[int]) -> bool:
+    """
+    Решает, анализировать видео по ключевым кадрам или загружать целиком через File API.
+    В режиме auto кадры используются для больших или длинных видео.
+    """
+    if not keyframes_available():
+        return False
+    if VIDEO_KEYFRAME_MODE == "always":
+        return True
+    if file_size and file_size >= VIDEO_KEYFRAME_MIN_SIZE_MB * 1024 * 1024:
+        return True
+    if duration and duration >= VIDEO_KEYFRAME_MIN_DURATION_S:
+        return True
+    return False
+
+
+def get_cached_keyframes(file_unique_id: str) -> Optional[List[bytes]]:
+    frames = _frames_cache.get(file_unique_id)
+    if frames is not None:
+        _frames_cache.move_to_end(file_unique_id)
+    return frames
+
+
+def _cache_keyframes(file_unique_id: str, frames: List[bytes]) -> None:
+    if VIDEO_KEYFRAME_CACHE_SIZE <= 0:
+        return
+    _frames_cache[file_unique_id] = frames
+    _frames_cache.move_to_end(file_unique_id)
+    while len(_frames_cache) > VIDEO_KEYFRAME_CACHE_SIZE:
+        evicted_id, _ = _frames_cache.popitem(last=False)
+        logger.info(f"Кадры видео {evicted_id} удалены из кэша.")
+
+
+def _read_frame(capture, index: int):
+    capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+    ok, frame = capture.read()
+    return frame if ok else None
+
+
+def _encode_frame(frame) -> Optional[bytes]:
+    height, width = frame.shape[:2]
+    scale = KEYFRAME_MAX_SIDE / max(height, width)
+    if scale < 1:
+        frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, KEYFRAME_JPEG_QUALITY])
+    return buffer.tobytes() if ok else None
+
+
+def _uniform_indices(total_frames: int, count: int) -> List[int]:
+    count = min(count, total_frames)
+    step = total_frames / count
+    return [int(step * i + step / 2) for i in range(count)]
+
+
+def _scene_change_frames(capture, total_frames: int, count: int) -> list:
+    """Оставляет count кадров с наибольшей сменой сцены среди равномерно выбранных кандидатов."""
+    candidates = _uniform_indices(total_frames, count * SCENE_CANDIDATES_PER_FRAME)
+    best: list = []
+    prev_hist = None
+    for index in candidates:
+        frame = _read_frame(capture, index)
+        if frame is None:
+            continue
+        hsv = cv2.cvtColor(cv2.resize(frame, (160, 90)), cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, [32, 32], [0, 180, 0, 256])
+        cv2.normalize(hist, hist)
+        if prev_hist is None:
+            score = float("inf")
+        else:
+            score = cv2.compareHist(prev_hist, hist, cv2.HISTCMP_BHATTACHARYYA)
+        prev_hist = hist
+        item = (score, index, frame)
+        if len(best) < count:
+            heapq.heappush(best, item)
+        elif score > best[0][0]:
+            heapq.heapreplace(best, item)
+    return [frame for _, _, frame in sorted(best, key=lambda item: item[1])]
+
+
+def _extract_keyframes_sync(video_path: str, count: int, method: str) -> List[bytes]:
+    """Выполняется в отдельном процессе: читает видео и возвращает JPEG-байты ключевых кадров."""
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError(f"Не удалось открыть видео: {video_path}")
+    try:
+        total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if total_frames <= 0:
+            raise ValueError(f"Не удалось определить число кадров: {video_path}")
+        if method == "scene":
+            frames = _scene_change_frames(capture, total_frames, count)
+        else:
+            frames = [_read_frame(capture, index) for index in _uniform_indices(total_frames, count)]
+
+        frames_bytes = []
+        for frame in frames:
+            if frame is None:
+                continue
+            encoded = _encode_frame(frame)
+            if encoded:
+                frames_bytes.append(encoded)
+        return frames_bytes
+    finally:
+        capture.release()
+
+
+def _extraction_worker(conn, video_path: str, count: int, method: str) -> None:
+    try:
+        conn.send(("ok", _extract_keyframes_sync(video_path, count, method)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _run_extraction_process(video_path: str, count: int, method: str, timeout: float) -> List[bytes]:
+    """
+    Запускает извлечение кадров в отдельном процессе и ждет результат не дольше timeout.
+    При превышении времени процесс завершается, чтобы зависший декодер не занимал CPU.
+    """
+    ctx = multiprocessing.get_context(_START_METHOD)
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_extraction_worker, args=(child_conn, video_path, count, method), daemon=True)
+    process.start()
+    child_conn.close()
+    try:
+        if not parent_conn.poll(timeout):
+            raise TimeoutError(f"извлечение кадров превысило {timeout} с")
+        try:
+            status, payload = parent_conn.recv()
+        except EOFError:
+            process.join(1)
+            raise RuntimeError(f"процесс извлечения кадров завершился аварийно (exitcode={process.exitcode})")
+        if status != "ok":
+            raise RuntimeError(payload)
+        return payload
+    finally:
+        parent_conn.close()
+        if process.is_alive():
+            process.terminate()
+            process.join(1)
+            if process.is_alive():
+                process.kill()
+        process.join()
+
+
+async def extract_keyframes(video_path: str, file_unique_id: str) -> Optional[List[bytes]]:
+    """
+    Извлекает ключевые кадры видео в отдельном процессе, не блокируя event loop.
+    Одновременно выполняется не более VIDEO_KEYFRAME_WORKERS извлечений.
+    Результат кэшируется по file_unique_id. При ошибке или превышении
+    VIDEO_KEYFRAME_TIMEOUT_S возвращает None.
+    """
+    if not keyframes_available():
+        return None
+    cached = get_cached_keyframes(file_unique_id)
+    if cached is not None:
+        return cached
+
+    loop = asyncio.get_running_loop()
+    try:
+        async with _extraction_slots:
+            frames = await loop.run_in_executor(
+                None, _run_extraction_process,
+                video_path, VIDEO_KEYFRAME_COUNT, VIDEO_KEYFRAME_METHOD, VIDEO_KEYFRAME_TIMEOUT_S
+            )
+    except TimeoutError as e:
+        logger.error(f"Таймаут извлечения кадров из {video_path}: {e}. Процесс остановлен.")
+        return None
+    except Exception as e:
+        logger.error(f"Ошибка извлечения кадров из {video_path}: {e}", exc_info=True)
+        return None
+
+    if not frames:
+        logger.warning(f"Не удалось извлечь кадры из видео {file_unique_id}.")
+        return None
+    logger.info(f"Извлечено {len(frames)} кадров из видео {file_unique_id} (method={VIDEO_KEYFRAME_METHOD}).")
+    _cache_keyframes(file_unique_id, frames)
+    return frames
@@ -10,6 +10,7 @@ from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
 
 from src.config import ADMIN_USER_ID, TELEGRAM_CHANNEL_ID
 from src.ai.generator import generate_text
+from src.ai.keyframes import should_use_keyframes, get_cached_keyframes, extract_keyframes
 
 admin_router = Router()
 logger = logging.getLogger(__name__)
@@ -241,6 +242,9 @@ async def process_single_photo(message: types.Message, bot: Bot, prompt: str, fi
     else:
         await processing_message.edit_text("❌ Не удалось сгенерировать текст (ошибка AI).")
 
+def _keyframes_prompt(prompt: str, frames_count: int) -> str:
+    return f"{prompt}\n\n(Видео передано как {frames_count} ключевых кадров в хронологическом порядке.)"
+
 @admin_router.message(F.video, F.caption, F.from_user.id == ADMIN_USER_ID)
 async def handle_video_with_caption(message: types.Message, bot: Bot):
     user_id = message.from_user.id
@@ -276,17 +280,33 @@ async def handle_video_with_caption(message: types.Message, bot: Bot):
                 await processing_message.edit_text(f"⚠️ Видео >~{round(BOT_MAX_DOWNLOAD_SIZE/(1024*1024))}MB, анализ невозможен.\n⏳ Генерация по тексту...")
                 generated_text = await generate_text(prompt=prompt, media_path=None, media_mime_type=None)
             else:
-                await processing_message.edit_text("⏳ Скачиваю видео...")
-                with tempfile.NamedTemporaryFile(suffix=f"_{file_id}.tmp", delete=True) as temp_file:
-                    temp_video_path = temp_file.name
-                    logger.info(f"Скачиваю видео {file_id} в {temp_video_path}")
-                    await bot.download_file(file_info.file_path, destination=temp_file)
-                    logger.info(f"Видео {file_id} скачано ({file_info.file_size} байт).")
-                    await processing_message.edit_text(f"⏳ Видео скачано (~{round(file_info.file_size/1024/1024)}MB). Анализ...")
-                    generated_text = await generate_text(prompt=prompt, media_path=temp_video_path, media_mime_type=mime_type)
+                use_keyframes = should_use_keyframes(file_info.file_size, video.duration)
+                keyframes = get_cached_keyframes(video.file_unique_id) if use_keyframes else None
+                if keyframes:
+                    logger.info(f"Кадры видео {file_id} взяты из кэша ({len(keyframes)} шт.).")
+                    await processing_message.edit_text(f"⏳ Кадры видео уже извлечены ({len(keyframes)} шт.). Анализ...")
+                    generated_text = await generate_text(prompt=_keyframes_prompt(prompt, len(keyframes)), images_bytes=keyframes)
                     video_was_analyzed = True
-                logger.info(f"Временный файл для {file_id} удален.")
-                temp_video_path = None
+                else:
+                    await processing_message.edit_text("⏳ Скачиваю видео...")
+                    with tempfile.NamedTemporaryFile(suffix=f"_{file_id}.tmp", delete=True) as temp_file:
+                        temp_video_path = temp_file.name
+                        logger.info(f"Скачиваю видео {file_id} в {temp_video_path}")
+                        await bot.download_file(file_info.file_path, destination=temp_file)
+                        logger.info(f"Видео {file_id} скачано ({file_info.file_size} байт).")
+                        if use_keyframes:
+                            await processing_message.edit_text(f"⏳ Видео скачано (~{round(file_info.file_size/1024/1024)}MB). Извлекаю ключевые кадры...")
+                            temp_file.flush()
+                            keyframes = await extract_keyframes(temp_video_path, video.file_unique_id)
+                        if keyframes:
+                            await processing_message.edit_text(f"⏳ Извлечено кадров: {len(keyframes)}. Анализ...")
+                            generated_text = await generate_text(prompt=_keyframes_prompt(prompt, len(keyframes)), images_bytes=keyframes)
+                        else:
+                            await processing_message.edit_text(f"⏳ Видео скачано (~{round(file_info.file_size/1024/1024)}MB). Анализ...")
+                            generated_text = await generate_text(prompt=prompt, media_path=temp_video_path, media_mime_type=mime_type)
+                        video_was_analyzed = True
+                    logger.info(f"Временный файл для {file_id} удален.")
+                    temp_video_path = None
 
     except TelegramAPIError as e:
         logger.error(f"Ошибка TG API (видео {file_id}): {e}", exc_info=True)
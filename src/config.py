@@ -45,11 +45,43 @@ if not CHANNEL_PERSONA:
 
 PROXY_URL = os.getenv("PROXY_URL")
 
+
+def _get_int_env(name: str, default: int) -> int:
+    value_str = os.getenv(name)
+    if not value_str:
+        return default
+    try:
+        return int(value_str)
+    except ValueError:
+        logger.error(f"Неверный формат {name}: {value_str}. Ожидалось число, используется {default}.")
+        return default
+
+
+# Режим ключевых кадров для видео: off - всегда File API, auto - по размеру/длительности, always - всегда кадры
+VIDEO_KEYFRAME_MODE = os.getenv("VIDEO_KEYFRAME_MODE", "off").strip().lower()
+if VIDEO_KEYFRAME_MODE not in ("off", "auto", "always"):
+    logger.error(f"Неверное значение VIDEO_KEYFRAME_MODE: {VIDEO_KEYFRAME_MODE}. Используется 'off'.")
+    VIDEO_KEYFRAME_MODE = "off"
+
+# Способ выбора кадров: scene - по смене сцен, uniform - равномерно
+VIDEO_KEYFRAME_METHOD = os.getenv("VIDEO_KEYFRAME_METHOD", "scene").strip().lower()
+if VIDEO_KEYFRAME_METHOD not in ("scene", "uniform"):
+    logger.error(f"Неверное значение VIDEO_KEYFRAME_METHOD: {VIDEO_KEYFRAME_METHOD}. Используется 'scene'.")
+    VIDEO_KEYFRAME_METHOD = "scene"
+
+VIDEO_KEYFRAME_COUNT = max(1, _get_int_env("VIDEO_KEYFRAME_COUNT", 8))
+VIDEO_KEYFRAME_MIN_SIZE_MB = _get_int_env("VIDEO_KEYFRAME_MIN_SIZE_MB", 5)
+VIDEO_KEYFRAME_MIN_DURATION_S = _get_int_env("VIDEO_KEYFRAME_MIN_DURATION_S", 30)
+VIDEO_KEYFRAME_CACHE_SIZE = max(0, _get_int_env("VIDEO_KEYFRAME_CACHE_SIZE", 32))
+VIDEO_KEYFRAME_WORKERS = max(1, _get_int_env("VIDEO_KEYFRAME_WORKERS", 2))
+VIDEO_KEYFRAME_TIMEOUT_S = max(1, _get_int_env("VIDEO_KEYFRAME_TIMEOUT_S", 60))
+
 logger.info("Конфигурация загружена.")
 logger.info(f"Admin User ID: {ADMIN_USER_ID}")
 logger.info(f"Target Channel ID: {TELEGRAM_CHANNEL_ID}")
 logger.info(f"Channel Persona loaded (first 50 chars): {CHANNEL_PERSONA[:50]}...")
 logger.info(f"Google Gemini API Key loaded: {'Yes' if GEMINI_API_KEY else 'No'}")
+logger.info(f"Video keyframe mode: {VIDEO_KEYFRAME_MODE} (method={VIDEO_KEYFRAME_METHOD}, frames={VIDEO_KEYFRAME_COUNT})")
 if PROXY_URL:
     logger.info(f"Proxy URL configured via PROXY_URL")
 else:
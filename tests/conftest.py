@@ -0,0 +1,4 @@
+import os
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("ADMIN_USER_ID", "1")
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("aiogram")
+pytest.importorskip("google.generativeai")
+pytest.importorskip("PIL")
+
+from src.bot import handlers
+
+
+@pytest.fixture
+def video_message():
+    message = MagicMock()
+    message.from_user.id = 1
+    message.caption = "Опиши видео"
+    message.video = SimpleNamespace(
+        file_id="file-id", file_unique_id="unique-id", mime_type="video/mp4", duration=120
+    )
+    processing_message = MagicMock()
+    processing_message.edit_text = AsyncMock()
+    message.reply = AsyncMock(return_value=processing_message)
+    return message
+
+
+@pytest.fixture
+def bot():
+    bot = MagicMock()
+    bot.get_file = AsyncMock(return_value=SimpleNamespace(file_size=10 * 1024 * 1024, file_path="videos/file.mp4"))
+    bot.download_file = AsyncMock()
+    bot.send_video = AsyncMock()
+    bot.send_message = AsyncMock()
+    return bot
+
+
+@pytest.fixture
+def generate_text(monkeypatch):
+    mock = AsyncMock(return_value="Готовый пост")
+    monkeypatch.setattr(handlers, "generate_text", mock)
+    monkeypatch.setattr(handlers, "TELEGRAM_CHANNEL_ID", -100)
+    return mock
+
+
+def _patch_keyframes(monkeypatch, use_keyframes, cached=None, extracted=None):
+    extract = AsyncMock(return_value=extracted)
+    monkeypatch.setattr(handlers, "should_use_keyframes", lambda file_size, duration: use_keyframes)
+    monkeypatch.setattr(handlers, "get_cached_keyframes", lambda file_unique_id: cached)
+    monkeypatch.setattr(handlers, "extract_keyframes", extract)
+    return extract
+
+
+def test_video_uses_extracted_keyframes(monkeypatch, video_message, bot, generate_text):
+    extract = _patch_keyframes(monkeypatch, True, extracted=[b"1", b"2"])
+    asyncio.run(handlers.handle_video_with_caption(video_message, bot))
+
+    extract.assert_awaited_once()
+    assert generate_text.await_args.kwargs["images_bytes"] == [b"1", b"2"]
+    assert "media_path" not in generate_text.await_args.kwargs
+    bot.send_message.assert_awaited_once_with(chat_id=-100, text="Готовый пост")
+
+
+def test_video_falls_back_to_file_api_when_extraction_fails(monkeypatch, video_message, bot, generate_text):
+    _patch_keyframes(monkeypatch, True, extracted=None)
+    asyncio.run(handlers.handle_video_with_caption(video_message, bot))
+
+    assert generate_text.await_args.kwargs["media_mime_type"] == "video/mp4"
+    assert generate_text.await_args.kwargs["media_path"]
+    bot.send_message.assert_awaited_once()
+
+
+def test_video_cache_hit_skips_download(monkeypatch, video_message, bot, generate_text):
+    extract = _patch_keyframes(monkeypatch, True, cached=[b"cached"])
+    asyncio.run(handlers.handle_video_with_caption(video_message, bot))
+
+    bot.download_file.assert_not_awaited()
+    extract.assert_not_awaited()
+    assert generate_text.await_args.kwargs["images_bytes"] == [b"cached"]
+
+
+def test_video_below_thresholds_uses_file_api(monkeypatch, video_message, bot, generate_text):
+    extract = _patch_keyframes(monkeypatch, False)
+    asyncio.run(handlers.handle_video_with_caption(video_message, bot))
+
+    extract.assert_not_awaited()
+    assert generate_text.await_args.kwargs["media_mime_type"] == "video/mp4"
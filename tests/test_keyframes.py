@@ -0,0 +1,176 @@
+import asyncio
+import multiprocessing
+
+import pytest
+
+from src.ai import keyframes
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    keyframes._frames_cache.clear()
+    yield
+    keyframes._frames_cache.clear()
+
+
+@pytest.fixture
+def auto_mode(monkeypatch):
+    monkeypatch.setattr(keyframes, "cv2", object())
+    monkeypatch.setattr(keyframes, "VIDEO_KEYFRAME_MODE", "auto")
+    monkeypatch.setattr(keyframes, "VIDEO_KEYFRAME_MIN_SIZE_MB", 5)
+    monkeypatch.setattr(keyframes, "VIDEO_KEYFRAME_MIN_DURATION_S", 30)
+
+
+def test_auto_mode_small_short_video_uses_file_api(auto_mode):
+    assert not keyframes.should_use_keyframes(5 * 1024 * 1024 - 1, 29)
+
+
+def test_auto_mode_size_threshold(auto_mode):
+    assert keyframes.should_use_keyframes(5 * 1024 * 1024, 1)
+
+
+def test_auto_mode_duration_threshold(auto_mode):
+    assert keyframes.should_use_keyframes(1024, 30)
+
+
+def test_auto_mode_missing_metadata(auto_mode):
+    assert not keyframes.should_use_keyframes(None, None)
+
+
+def test_off_mode_never_uses_keyframes(monkeypatch):
+    monkeypatch.setattr(keyframes, "cv2", object())
+    monkeypatch.setattr(keyframes, "VIDEO_KEYFRAME_MODE", "off")
+    assert not keyframes.should_use_keyframes(100 * 1024 * 1024, 600)
+
+
+def test_no_cv2_never_uses_keyframes(monkeypatch):
+    monkeypatch.setattr(keyframes, "cv2", None)
+    monkeypatch.setattr(keyframes, "VIDEO_KEYFRAME_MODE", "always")
+    assert not keyframes.should_use_keyframes(100 * 1024 * 1024, 600)
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(keyframes, "VIDEO_KEYFRAME_CACHE_SIZE", 2)
+    keyframes._cache_keyframes("a", [b"a"])
+    keyframes._cache_keyframes("b", [b"b"])
+    assert keyframes.get_cached_keyframes("a") == [b"a"]
+    keyframes._cache_keyframes("c", [b"c"])
+
+    assert keyframes.get_cached_keyframes("b") is None
+    assert keyframes.get_cached_keyframes("a") == [b"a"]
+    assert keyframes.get_cached_keyframes("c") == [b"c"]
+    assert len(keyframes._frames_cache) == 2
+
+
+def test_cache_disabled(monkeypatch):
+    monkeypatch.setattr(keyframes, "VIDEO_KEYFRAME_CACHE_SIZE", 0)
+    keyframes._cache_keyframes("a", [b"a"])
+    assert keyframes.get_cached_keyframes("a") is None
+
+
+def test_uniform_indices_are_spread_and_in_range():
+    assert keyframes._uniform_indices(100, 4) == [12, 37, 62, 87]
+
+
+def test_uniform_indices_short_video():
+    assert keyframes._uniform_indices(3, 8) == [0, 1, 2]
+
+
+SCENE_COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 255), (0, 0, 0)]
+
+
+@pytest.fixture
+def scenes_clip(tmp_path):
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+    path = str(tmp_path / "scenes.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for color in SCENE_COLORS:
+        frame = np.full((48, 64, 3), color, dtype=np.uint8)
+        for _ in range(20):
+            writer.write(frame)
+    writer.release()
+    return path
+
+
+def _decoded_colors(frames_bytes):
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+    colors = set()
+    for data in frames_bytes:
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        assert frame is not None
+        b, g, r = frame[24, 32]
+        colors.add(min(range(len(SCENE_COLORS)), key=lambda i: sum(abs(int(c) - t) for c, t in zip((b, g, r), SCENE_COLORS[i]))))
+    return colors
+
+
+@pytest.mark.parametrize("method", ["scene", "uniform"])
+def test_extract_keyframes_sync(scenes_clip, method):
+    frames = keyframes._extract_keyframes_sync(scenes_clip, 8, method)
+    assert len(frames) == 8
+    assert _decoded_colors(frames) == set(range(len(SCENE_COLORS)))
+
+
+def test_extract_keyframes_sync_missing_file(tmp_path):
+    pytest.importorskip("cv2")
+    with pytest.raises(ValueError):
+        keyframes._extract_keyframes_sync(str(tmp_path / "missing.mp4"), 8, "scene")
+
+
+def test_run_extraction_process(scenes_clip):
+    frames = keyframes._run_extraction_process(scenes_clip, 4, "uniform", 60)
+    assert len(frames) == 4
+
+
+def test_run_extraction_process_reports_worker_error(tmp_path):
+    pytest.importorskip("cv2")
+    with pytest.raises(RuntimeError, match="ValueError"):
+        keyframes._run_extraction_process(str(tmp_path / "missing.mp4"), 8, "scene", 60)
+
+
+def test_run_extraction_process_timeout_terminates_worker(scenes_clip):
+    with pytest.raises(TimeoutError):
+        keyframes._run_extraction_process(scenes_clip, 8, "scene", 0.001)
+    assert multiprocessing.active_children() == []
+
+
+@pytest.fixture
+def stub_extraction(monkeypatch, auto_mode):
+    calls = []
+
+    def install(result):
+        def fake_run(video_path, count, method, timeout):
+            calls.append(video_path)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        monkeypatch.setattr(keyframes, "_run_extraction_process", fake_run)
+        return calls
+
+    return install
+
+
+def test_extract_keyframes_caches_result(stub_extraction):
+    calls = stub_extraction([b"frame"])
+    assert asyncio.run(keyframes.extract_keyframes("video.mp4", "uid")) == [b"frame"]
+    assert asyncio.run(keyframes.extract_keyframes("video.mp4", "uid")) == [b"frame"]
+    assert calls == ["video.mp4"]
+
+
+@pytest.mark.parametrize("result", [
+    TimeoutError("too slow"),
+    RuntimeError("процесс извлечения кадров завершился аварийно (exitcode=-11)"),
+    [],
+])
+def test_extract_keyframes_failures_return_none(stub_extraction, result):
+    stub_extraction(result)
+    assert asyncio.run(keyframes.extract_keyframes("video.mp4", "uid")) is None
+    assert keyframes.get_cached_keyframes("uid") is None
+
+
+def test_extract_keyframes_failure_does_not_affect_next_call(stub_extraction):
+    stub_extraction(RuntimeError("worker died"))
+    assert asyncio.run(keyframes.extract_keyframes("bad.mp4", "bad")) is None
+    stub_extraction([b"frame"])
+    assert asyncio.run(keyframes.extract_keyframes("good.mp4", "good")) == [b"frame"]